@@ -1,10 +1,51 @@
 # Flask Web Application for Docker Optimization Demo
 from flask import Flask, jsonify, render_template_string
+from flask.json.provider import DefaultJSONProvider
+import orjson
 import os
 import psutil
 import datetime
+import time
+from importlib.metadata import version as package_version
 
-app = Flask(__name__)
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode JSON responses with orjson's C encoder instead of stdlib json"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+class DemoApp(Flask):
+    json_provider_class = OrjsonProvider
+
+app = DemoApp(__name__)
+
+# Values that never change during the process lifetime; looking them up per
+# request costs syscalls (os.uname) and getenv lookups for nothing
+CPU_COUNT = psutil.cpu_count()
+PYTHON_VERSION = os.sys.version.split()[0]
+HOSTNAME = os.uname().nodename
+ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+DEBUG = os.getenv('DEBUG', 'false')
+APP_VERSION = os.getenv('APP_VERSION', '1.0.0')
+
+# psutil.virtual_memory() reads and parses /proc/meminfo on every call;
+# cache the value for a second so frequent hits don't pay for it each time
+_memory_cache = {'at': 0.0, 'mb': 0.0}
+
+def memory_mb():
+    """Used memory in MB, refreshed at most once per second"""
+    now = time.monotonic()
+    if now - _memory_cache['at'] > 1.0:
+        _memory_cache['mb'] = round(psutil.virtual_memory().used / 1024 / 1024, 2)
+        _memory_cache['at'] = now
+    return _memory_cache['mb']
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -54,14 +95,14 @@ HTML_TEMPLATE = """
 @app.route('/')
 def home():
     return render_template_string(HTML_TEMPLATE,
-        memory_mb=round(psutil.virtual_memory().used / 1024 / 1024, 2),
-        cpu_count=psutil.cpu_count(),
-        python_version=os.sys.version.split()[0],
-        hostname=os.uname().nodename,
+        memory_mb=memory_mb(),
+        cpu_count=CPU_COUNT,
+        python_version=PYTHON_VERSION,
+        hostname=HOSTNAME,
         timestamp=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        env=os.getenv('ENVIRONMENT', 'development'),
-        debug=os.getenv('DEBUG', 'false'),
-        version=os.getenv('APP_VERSION', '1.0.0')
+        env=ENVIRONMENT,
+        debug=DEBUG,
+        version=APP_VERSION
     )
 
 @app.route('/health')
@@ -69,20 +110,20 @@ def health():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.datetime.now().isoformat(),
-        'memory_mb': round(psutil.virtual_memory().used / 1024 / 1024, 2),
-        'version': os.getenv('APP_VERSION', '1.0.0')
+        'memory_mb': memory_mb(),
+        'version': APP_VERSION
     })
 
 @app.route('/info')
 def info():
     return jsonify({
         'python_version': os.sys.version,
-        'flask_version': Flask.__version__,
-        'hostname': os.uname().nodename,
-        'environment': os.getenv('ENVIRONMENT', 'development'),
-        'debug': os.getenv('DEBUG', 'false'),
-        'memory_mb': round(psutil.virtual_memory().used / 1024 / 1024, 2),
-        'cpu_count': psutil.cpu_count()
+        'flask_version': package_version('flask'),
+        'hostname': HOSTNAME,
+        'environment': ENVIRONMENT,
+        'debug': DEBUG,
+        'memory_mb': memory_mb(),
+        'cpu_count': CPU_COUNT
     })
 
 if __name__ == '__main__':
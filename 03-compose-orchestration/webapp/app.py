@@ -1,13 +1,46 @@
 # Full-Stack Web Application with Docker Compose
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, jsonify, make_response, request
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import Template
+import orjson
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import redis
+import csv
+import ctypes
+import hashlib
+import io
 import os
 import json
+import queue
+import threading
 import time
+import weakref
+from importlib.metadata import version as package_version
+from contextlib import contextmanager
+from functools import wraps
 from datetime import datetime
+from multiprocessing import Value
 
-app = Flask(__name__)
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson's C encoder instead of stdlib json"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand the encoded bytes to the response directly; no str round trip
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+class WebApp(Flask):
+    json_provider_class = OrjsonProvider
+
+app = WebApp(__name__)
 
 # Database configuration
 DB_CONFIG = {
@@ -22,6 +55,16 @@ DB_CONFIG = {
 REDIS_HOST = os.getenv('REDIS_HOST', 'cache')
 REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
 
+# Shared Redis client; commands draw sockets from a keepalive pool instead
+# of reconnecting per request
+REDIS = redis.Redis(connection_pool=redis.ConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    decode_responses=True,
+    max_connections=32,
+    socket_keepalive=True
+))
+
 # HTML Template
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -197,216 +240,513 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Compile the template once at import; render_template_string would re-parse
+# and re-compile it on every request
+_TEMPLATE = Template(HTML_TEMPLATE)
+
+# Template fields that never change during the process lifetime; computing
+# them per request costs syscalls (os.uname) and getenv lookups for nothing
+_STATIC_CONTEXT = {
+    'hostname': os.uname().nodename,
+    'environment': os.getenv('FLASK_ENV', 'development'),
+    'version': os.getenv('APP_VERSION', '1.0.0'),
+    'db_host': DB_CONFIG['host'],
+    'db_name': DB_CONFIG['database'],
+    'redis_host': REDIS_HOST,
+}
+
+# INFO returns hundreds of fields and is one of Redis' most expensive
+# commands; cache the few values we report instead of calling it per request
+_redis_version = None
+_redis_memory_cache = {'at': 0.0, 'value': 'N/A'}
+
+def redis_version():
+    """Redis server version, fetched once per process"""
+    global _redis_version
+    if _redis_version is None:
+        _redis_version = REDIS.info('server').get('redis_version')
+    return _redis_version
+
+def redis_memory_human():
+    """Human-readable Redis memory usage, refreshed at most every 5 seconds"""
+    now = time.monotonic()
+    if now - _redis_memory_cache['at'] > 5.0:
+        _redis_memory_cache['value'] = REDIS.info('memory').get('used_memory_human', 'N/A')
+        _redis_memory_cache['at'] = now
+    return _redis_memory_cache['value']
+
+# Formatting a timestamp costs a gettimeofday, a timezone lookup and a
+# strftime; cache both renderings per whole second so the work runs at most
+# once per second no matter the request rate
+_now_cache = {'second': 0, 'human': '', 'iso': ''}
+
+def now_str():
+    """Current time as 'YYYY-MM-DD HH:MM:SS', formatted at most once per second"""
+    second = int(time.time())
+    if second != _now_cache['second']:
+        now = datetime.fromtimestamp(second)
+        _now_cache['human'] = now.strftime('%Y-%m-%d %H:%M:%S')
+        _now_cache['iso'] = now.isoformat()
+        _now_cache['second'] = second
+    return _now_cache['human']
+
+def now_iso():
+    """Current time in ISO 8601 form, formatted at most once per second"""
+    now_str()
+    return _now_cache['iso']
+
+# Short-lived server-side response cache with ETag revalidation
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+def cached_response(timeout):
+    """Cache a view's rendered response for `timeout` seconds
+
+    Near-identical payloads are served straight from memory instead of
+    re-running the DB/Redis queries and the template render. Clients get a
+    Cache-Control header and an ETag, and receive 304 Not Modified when
+    their cached copy is still current.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            with _response_cache_lock:
+                entry = _response_cache.get(request.path)
+
+            if entry is None or now >= entry['expires']:
+                response = make_response(view(*args, **kwargs))
+                entry = {
+                    'expires': now + timeout,
+                    'body': response.get_data(),
+                    'etag': hashlib.md5(response.get_data()).hexdigest(),
+                    'content_type': response.content_type,
+                }
+                with _response_cache_lock:
+                    _response_cache[request.path] = entry
+
+            if entry['etag'] in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                response = make_response(entry['body'])
+                response.content_type = entry['content_type']
+            response.set_etag(entry['etag'])
+            response.headers['Cache-Control'] = f'public, max-age={timeout}'
+            return response
+        return wrapper
+    return decorator
+
+# Static part of the system-info panel; only the service status lines
+# change between requests
+_SYSTEM_INFO_STATIC = f"""Environment Variables:
+DB_HOST: {os.getenv('DB_HOST', 'database')}
+DB_NAME: {os.getenv('DB_NAME', 'webapp')}
+REDIS_HOST: {os.getenv('REDIS_HOST', 'cache')}
+FLASK_ENV: {os.getenv('FLASK_ENV', 'development')}
+
+Container Information:
+Hostname: {os.uname().nodename}
+Python Version: {os.sys.version.split()[0]}
+Flask Version: {package_version('flask')}
+
+Service Status:"""
+
+# Shared connection pool (created lazily so import doesn't require the database)
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """Get the shared connection pool, creating it on first use"""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                try:
+                    _db_pool = ThreadedConnectionPool(minconn=2, maxconn=20, **DB_CONFIG)
+                except Exception as e:
+                    print(f"Database pool error: {e}")
+    return _db_pool
+
 def get_db_connection():
-    """Get database connection with retry logic"""
+    """Get database connection from the shared pool"""
+    pool = get_db_pool()
+    if pool is None:
+        return None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
+        return pool.getconn()
     except Exception as e:
         print(f"Database connection error: {e}")
         return None
 
-def get_redis_connection():
-    """Get Redis connection with retry logic"""
+# Statements used on every request; prepared once per physical connection so
+# Postgres skips parse/plan on each EXECUTE
+_PREPARED_STATEMENTS = (
+    """
+    PREPARE sys_stats AS
+    WITH tables AS (
+        SELECT COUNT(*) AS c FROM information_schema.tables WHERE table_schema = 'public'
+    ), activity AS (
+        SELECT COUNT(*) AS c FROM pg_stat_activity
+    )
+    SELECT tables.c, activity.c FROM tables, activity
+    """,
+    "PREPARE db_info AS SELECT version(), (SELECT COUNT(*) FROM requests)",
+    """
+    PREPARE top_endpoints AS
+    SELECT endpoint, COUNT(*) AS hits
+    FROM requests
+    GROUP BY endpoint
+    ORDER BY hits DESC
+    LIMIT 10
+    """,
+)
+_prepared_conns = weakref.WeakSet()
+
+def _prepare_statements(conn):
+    """Prepare the hot-path statements once per physical connection
+
+    Statements are prepared independently: one failing (e.g. a relation
+    that initialize_database hasn't created yet) must not block the rest,
+    and statements left over from an earlier partially failed checkout are
+    not an error. The connection only enters the WeakSet once every
+    statement exists, so later checkouts retry the missing ones.
+    """
+    if conn in _prepared_conns:
+        return
+    prepared_all = True
+    cur = conn.cursor()
+    for statement in _PREPARED_STATEMENTS:
+        try:
+            cur.execute(statement)
+            if not conn.autocommit:
+                conn.commit()
+        except psycopg2.errors.DuplicatePreparedStatement:
+            # Already prepared during an earlier partially failed checkout
+            if not conn.autocommit:
+                conn.rollback()
+        except Exception as e:
+            print(f"Statement preparation error: {e}")
+            prepared_all = False
+            if not conn.autocommit:
+                conn.rollback()
+    cur.close()
+    if prepared_all:
+        _prepared_conns.add(conn)
+
+@contextmanager
+def db_connection(autocommit=False):
+    """Check a connection out of the pool and return it when done
+
+    Read-only callers pass autocommit=True so each SELECT skips the
+    implicit BEGIN/COMMIT pair and never leaves the connection idle in
+    transaction between requests.
+    """
+    conn = get_db_connection()
     try:
-        r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
-        r.ping()  # Test connection
-        return r
-    except Exception as e:
-        print(f"Redis connection error: {e}")
-        return None
+        if conn is not None:
+            # Checkout housekeeping must never 500 a request or leak the
+            # connection: a dead server shows up here first (e.g. rollback
+            # or the autocommit toggle raising after a Postgres restart)
+            try:
+                if conn.autocommit != autocommit:
+                    conn.autocommit = autocommit
+                _prepare_statements(conn)
+            except Exception as e:
+                print(f"Connection checkout error: {e}")
+        yield conn
+    finally:
+        if conn is not None:
+            get_db_pool().putconn(conn)
 
 def initialize_database():
     """Initialize database with sample tables"""
-    conn = get_db_connection()
-    if conn:
+    with db_connection() as conn:
+        if conn:
+            try:
+                cur = conn.cursor()
+
+                # Create tables
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS requests (
+                        id SERIAL PRIMARY KEY,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        ip_address VARCHAR(45),
+                        user_agent TEXT,
+                        endpoint VARCHAR(255)
+                    )
+                """)
+
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS metrics (
+                        id SERIAL PRIMARY KEY,
+                        metric_name VARCHAR(100),
+                        metric_value INTEGER,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Insert initial metrics
+                cur.execute("INSERT INTO metrics (metric_name, metric_value) VALUES ('total_requests', 0) ON CONFLICT DO NOTHING")
+                cur.execute("INSERT INTO metrics (metric_name, metric_value) VALUES ('db_connections', 0) ON CONFLICT DO NOTHING")
+
+                conn.commit()
+                cur.close()
+                print("Database initialized successfully")
+            except Exception as e:
+                print(f"Database initialization error: {e}")
+
+# Request logs are queued and written in batches by a background thread so
+# endpoints don't wait on the INSERT/UPDATE
+_log_queue = queue.Queue(maxsize=10000)
+_log_worker_started = False
+_log_worker_lock = threading.Lock()
+
+# Per-worker request counter: a plain shared-memory add on the request path
+# instead of a Redis round trip; the log worker flushes the accumulated
+# delta to Redis with one INCRBY per drain (lost updates under contention
+# are tolerable for a stats counter)
+_request_counter = Value(ctypes.c_uint64, 0, lock=False)
+_request_counter_flushed = 0
+
+def _seed_request_counter():
+    """Seed the Redis counter from the durable metrics row
+
+    The compose cache service keeps no persistent state, so after a Redis
+    restart (or on an upgraded installation) the counter would restart
+    near zero. SET NX only fills the key in when Redis doesn't already
+    hold a value.
+    """
+    with db_connection(autocommit=True) as conn:
+        if conn:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT metric_value FROM metrics WHERE metric_name = 'total_requests'")
+                row = cur.fetchone()
+                cur.close()
+                if row:
+                    REDIS.set('metric:total_requests', int(row[0]), nx=True)
+            except Exception as e:
+                print(f"Metric seeding error: {e}")
+
+def _flush_request_counter():
+    """Push locally counted requests to the shared Redis counter"""
+    global _request_counter_flushed
+    delta = _request_counter.value - _request_counter_flushed
+    if delta:
         try:
-            cur = conn.cursor()
-            
-            # Create tables
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS requests (
-                    id SERIAL PRIMARY KEY,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    ip_address VARCHAR(45),
-                    user_agent TEXT,
-                    endpoint VARCHAR(255)
-                )
-            """)
-            
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS metrics (
-                    id SERIAL PRIMARY KEY,
-                    metric_name VARCHAR(100),
-                    metric_value INTEGER,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Insert initial metrics
-            cur.execute("INSERT INTO metrics (metric_name, metric_value) VALUES ('total_requests', 0) ON CONFLICT DO NOTHING")
-            cur.execute("INSERT INTO metrics (metric_name, metric_value) VALUES ('db_connections', 0) ON CONFLICT DO NOTHING")
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            print("Database initialized successfully")
+            REDIS.incrby('metric:total_requests', delta)
+            _request_counter_flushed += delta
         except Exception as e:
-            print(f"Database initialization error: {e}")
+            print(f"Redis error: {e}")
 
-def log_request(endpoint):
-    """Log request to database"""
-    conn = get_db_connection()
-    if conn:
+def _write_log_batch(cur, batch):
+    """Insert a batch of request rows in a single statement"""
+    if len(batch) > 5000:
+        # Very large drains (e.g. after a database stall) go through COPY
+        buf = io.StringIO()
+        csv.writer(buf).writerows(batch)
+        buf.seek(0)
+        cur.copy_expert("COPY requests (ip_address, user_agent, endpoint) FROM STDIN WITH CSV", buf)
+    else:
+        execute_values(
+            cur,
+            "INSERT INTO requests (ip_address, user_agent, endpoint) VALUES %s",
+            batch,
+            page_size=500
+        )
+
+def _drain_log_queue():
+    """Background worker: write queued request logs in batches"""
+    _seed_request_counter()
+    while True:
+        # Block for the first entry, then collect up to 500 rows or 200 ms
+        batch = [_log_queue.get()]
+        deadline = time.monotonic() + 0.2
+        while len(batch) < 500:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_log_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Catch up on anything that queued meanwhile without waiting again
         try:
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO requests (ip_address, user_agent, endpoint) VALUES (%s, %s, %s)",
-                (request.remote_addr if request else '127.0.0.1', 
-                 request.headers.get('User-Agent', 'Unknown') if request else 'System',
-                 endpoint)
-            )
-            
-            # Update request counter
-            cur.execute("UPDATE metrics SET metric_value = metric_value + 1 WHERE metric_name = 'total_requests'")
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-        except Exception as e:
-            print(f"Request logging error: {e}")
+            while True:
+                batch.append(_log_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        _flush_request_counter()
+
+        with db_connection() as conn:
+            if conn:
+                try:
+                    cur = conn.cursor()
+                    _write_log_batch(cur, batch)
+
+                    # Lazily persist the Redis-held request counter.
+                    # GREATEST keeps the row monotonic so a reset Redis
+                    # value can never clobber the durable total
+                    try:
+                        total = int(REDIS.get('metric:total_requests') or 0)
+                        cur.execute(
+                            "UPDATE metrics SET metric_value = GREATEST(metric_value, %s), updated_at = CURRENT_TIMESTAMP WHERE metric_name = 'total_requests'",
+                            (total,)
+                        )
+                    except Exception as e:
+                        print(f"Metric persistence error: {e}")
+
+                    conn.commit()
+                    cur.close()
+                except Exception as e:
+                    print(f"Request logging error: {e}")
+
+def _ensure_log_worker():
+    """Start the log writer thread on first use (safe after gunicorn fork)"""
+    global _log_worker_started
+    if not _log_worker_started:
+        with _log_worker_lock:
+            if not _log_worker_started:
+                threading.Thread(target=_drain_log_queue, daemon=True).start()
+                _log_worker_started = True
+
+def log_request(endpoint):
+    """Queue a request log entry for the background writer"""
+    _ensure_log_worker()
+
+    # Count the request with a shared-memory add; the background worker
+    # flushes the delta to Redis and persists it to Postgres
+    _request_counter.value += 1
+
+    try:
+        _log_queue.put_nowait((
+            request.remote_addr if request else '127.0.0.1',
+            request.headers.get('User-Agent', 'Unknown') if request else 'System',
+            endpoint
+        ))
+    except queue.Full:
+        pass  # Drop the log entry rather than block the request
 
 def get_system_stats():
     """Get system statistics"""
     stats = {}
     
     # Database stats
-    conn = get_db_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public'")
-            stats['table_count'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT metric_value FROM metrics WHERE metric_name = 'total_requests'")
-            result = cur.fetchone()
-            stats['total_requests'] = result[0] if result else 0
-            
-            cur.execute("SELECT COUNT(*) FROM pg_stat_activity")
-            stats['db_connections'] = cur.fetchone()[0]
-            
-            cur.close()
-            conn.close()
-            stats['db_status'] = 'CONNECTED'
-            stats['db_status_class'] = 'status-healthy'
-        except Exception as e:
-            stats['db_status'] = 'ERROR'
+    with db_connection(autocommit=True) as conn:
+        if conn:
+            try:
+                cur = conn.cursor()
+                # Single round trip, pre-planned on the server
+                cur.execute("EXECUTE sys_stats")
+                stats['table_count'], stats['db_connections'] = cur.fetchone()
+
+                cur.close()
+                stats['db_status'] = 'CONNECTED'
+                stats['db_status_class'] = 'status-healthy'
+            except Exception as e:
+                stats['db_status'] = 'ERROR'
+                stats['db_status_class'] = 'status-error'
+                stats['table_count'] = 0
+                stats['db_connections'] = 0
+        else:
+            stats['db_status'] = 'DISCONNECTED'
             stats['db_status_class'] = 'status-error'
             stats['table_count'] = 0
-            stats['total_requests'] = 0
             stats['db_connections'] = 0
-    else:
-        stats['db_status'] = 'DISCONNECTED'
-        stats['db_status_class'] = 'status-error'
-        stats['table_count'] = 0
-        stats['total_requests'] = 0
-        stats['db_connections'] = 0
     
-    # Redis stats
-    r = get_redis_connection()
-    if r:
-        try:
-            info = r.info()
-            stats['redis_status'] = 'CONNECTED'
-            stats['redis_status_class'] = 'status-healthy'
-            stats['redis_memory'] = f"{info.get('used_memory_human', 'N/A')}"
-            stats['redis_keys'] = r.dbsize()
-            
-            # Get cache hits from Redis
-            stats['cache_hits'] = int(r.get('cache_hits') or 0)
-        except Exception as e:
-            stats['redis_status'] = 'ERROR'
-            stats['redis_status_class'] = 'status-error'
-            stats['redis_memory'] = 'N/A'
-            stats['redis_keys'] = 0
-            stats['cache_hits'] = 0
-    else:
-        stats['redis_status'] = 'DISCONNECTED'
+    # Redis stats (pipelined: one round trip instead of four)
+    try:
+        pipe = REDIS.pipeline(transaction=False)
+        pipe.dbsize()
+        pipe.get('cache_hits')
+        pipe.get('metric:total_requests')
+        dbsize, cache_hits, total_requests = pipe.execute()
+
+        stats['redis_status'] = 'CONNECTED'
+        stats['redis_status_class'] = 'status-healthy'
+        stats['redis_memory'] = redis_memory_human()
+        stats['redis_keys'] = dbsize
+        stats['cache_hits'] = int(cache_hits or 0)
+        stats['total_requests'] = int(total_requests or 0)
+    except Exception as e:
+        stats['redis_status'] = 'ERROR'
         stats['redis_status_class'] = 'status-error'
         stats['redis_memory'] = 'N/A'
         stats['redis_keys'] = 0
         stats['cache_hits'] = 0
-    
+        stats['total_requests'] = 0
+
     return stats
 
 @app.route('/')
 def home():
-    start_time = time.time()
     log_request('/')
-    
+
     # Increment cache hits
-    r = get_redis_connection()
-    if r:
-        r.incr('cache_hits')
-    
-    stats = get_system_stats()
-    
-    system_info = f"""Environment Variables:
-DB_HOST: {os.getenv('DB_HOST', 'database')}
-DB_NAME: {os.getenv('DB_NAME', 'webapp')}
-REDIS_HOST: {os.getenv('REDIS_HOST', 'cache')}
-FLASK_ENV: {os.getenv('FLASK_ENV', 'development')}
+    try:
+        REDIS.incr('cache_hits')
+    except Exception as e:
+        print(f"Redis error: {e}")
 
-Container Information:
-Hostname: {os.uname().nodename}
-Python Version: {os.sys.version.split()[0]}
-Flask Version: {Flask.__version__}
+    return _render_home()
 
-Service Status:
+@cached_response(2)
+def _render_home():
+    """Render the dashboard page (cached for a couple of seconds)"""
+    start_time = time.time()
+    stats = get_system_stats()
+
+    system_info = f"""{_SYSTEM_INFO_STATIC}
 Database: {stats['db_status']}
 Redis: {stats['redis_status']}
 """
     
     response_time = round((time.time() - start_time) * 1000, 2)
     
-    return render_template_string(HTML_TEMPLATE,
-        hostname=os.uname().nodename,
-        environment=os.getenv('FLASK_ENV', 'development'),
-        version=os.getenv('APP_VERSION', '1.0.0'),
+    return _TEMPLATE.render(
         uptime=int(time.time()),
-        timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        db_host=DB_CONFIG['host'],
-        db_name=DB_CONFIG['database'],
-        redis_host=REDIS_HOST,
+        timestamp=now_str(),
         response_time=response_time,
         system_info=system_info,
+        **_STATIC_CONTEXT,
         **stats
     )
 
 @app.route('/health')
 def health():
-    log_request('/health')
-    
+    # Liveness probe: load balancers hit this every few seconds per
+    # container, so it must not touch the database or Redis
+    return jsonify({'status': 'ok'})
+
+@app.route('/ready')
+def ready():
+    log_request('/ready')
+    return _readiness_response()
+
+@cached_response(5)
+def _readiness_response():
+    """Probe the backing services (cached between probes)"""
     health_status = {
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': now_iso(),
         'services': {}
     }
     
     # Check database
-    conn = get_db_connection()
-    if conn:
-        health_status['services']['database'] = 'healthy'
-        conn.close()
-    else:
-        health_status['services']['database'] = 'unhealthy'
-        health_status['status'] = 'degraded'
+    with db_connection(autocommit=True) as conn:
+        if conn:
+            health_status['services']['database'] = 'healthy'
+        else:
+            health_status['services']['database'] = 'unhealthy'
+            health_status['status'] = 'degraded'
     
     # Check Redis
-    r = get_redis_connection()
-    if r:
+    try:
+        REDIS.ping()
         health_status['services']['redis'] = 'healthy'
-    else:
+    except Exception:
         health_status['services']['redis'] = 'unhealthy'
         health_status['status'] = 'degraded'
     
@@ -415,63 +755,80 @@ def health():
 @app.route('/api/test-db')
 def test_db():
     log_request('/api/test-db')
-    
-    conn = get_db_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT version()")
-            version = cur.fetchone()[0]
-            cur.execute("SELECT COUNT(*) FROM requests")
-            request_count = cur.fetchone()[0]
-            cur.close()
-            conn.close()
-            
-            return jsonify({
-                'status': 'success',
-                'database_version': version,
-                'total_requests': request_count,
-                'timestamp': datetime.now().isoformat()
-            })
-        except Exception as e:
-            return jsonify({'status': 'error', 'message': str(e)})
-    else:
-        return jsonify({'status': 'error', 'message': 'Cannot connect to database'})
+
+    with db_connection(autocommit=True) as conn:
+        if conn:
+            try:
+                cur = conn.cursor()
+                cur.execute("EXECUTE db_info")
+                version, request_count = cur.fetchone()
+                cur.close()
+
+                return jsonify({
+                    'status': 'success',
+                    'database_version': version,
+                    'total_requests': request_count,
+                    'timestamp': now_iso()
+                })
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)})
+        else:
+            return jsonify({'status': 'error', 'message': 'Cannot connect to database'})
 
 @app.route('/api/test-cache')
 def test_cache():
     log_request('/api/test-cache')
     
-    r = get_redis_connection()
-    if r:
-        try:
-            test_key = f"test:{int(time.time())}"
-            test_value = f"Hello from Redis at {datetime.now().isoformat()}"
-            
-            r.setex(test_key, 60, test_value)  # Expire in 60 seconds
-            retrieved_value = r.get(test_key)
-            
-            info = r.info()
-            
-            return jsonify({
-                'status': 'success',
-                'test_key': test_key,
-                'test_value': test_value,
-                'retrieved_value': retrieved_value,
-                'redis_version': info.get('redis_version'),
-                'memory_usage': info.get('used_memory_human'),
-                'total_keys': r.dbsize(),
-                'timestamp': datetime.now().isoformat()
-            })
-        except Exception as e:
-            return jsonify({'status': 'error', 'message': str(e)})
-    else:
+    try:
+        test_key = f"test:{int(time.time())}"
+        test_value = f"Hello from Redis at {now_iso()}"
+
+        # Pipeline the commands: one round trip instead of four
+        pipe = REDIS.pipeline(transaction=False)
+        pipe.setex(test_key, 60, test_value)  # Expire in 60 seconds
+        pipe.get(test_key)
+        pipe.dbsize()
+        _, retrieved_value, dbsize = pipe.execute()
+
+        return jsonify({
+            'status': 'success',
+            'test_key': test_key,
+            'test_value': test_value,
+            'retrieved_value': retrieved_value,
+            'redis_version': redis_version(),
+            'memory_usage': redis_memory_human(),
+            'total_keys': dbsize,
+            'timestamp': now_iso()
+        })
+    except redis.exceptions.ConnectionError:
         return jsonify({'status': 'error', 'message': 'Cannot connect to Redis'})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+def get_top_endpoints():
+    """Aggregate request counts per endpoint inside Postgres
+
+    Set-at-a-time aggregation on the server beats shipping the log rows
+    to Python and looping over them here.
+    """
+    with db_connection(autocommit=True) as conn:
+        if conn:
+            try:
+                cur = conn.cursor()
+                cur.execute("EXECUTE top_endpoints")
+                rows = cur.fetchall()
+                cur.close()
+                return [{'endpoint': endpoint, 'hits': hits} for endpoint, hits in rows]
+            except Exception as e:
+                print(f"Stats aggregation error: {e}")
+    return []
 
 @app.route('/api/stats')
 def api_stats():
     log_request('/api/stats')
-    return jsonify(get_system_stats())
+    stats = get_system_stats()
+    stats['top_endpoints'] = get_top_endpoints()
+    return jsonify(stats)
 
 if __name__ == '__main__':
     # Initialize database on startup
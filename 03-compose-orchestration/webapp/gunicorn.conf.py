@@ -0,0 +1,19 @@
+# Gunicorn configuration for the compose webapp
+#
+# The endpoints spend most of their time waiting on PostgreSQL and Redis,
+# so gevent workers let many in-flight requests share each OS thread
+# instead of serializing behind Werkzeug's dev server.
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = 'gevent'
+worker_connections = 1000
+keepalive = 30
+timeout = 30
+
+def post_fork(server, worker):
+    # Make psycopg2 yield to the gevent hub while waiting on PostgreSQL;
+    # without this every DB call blocks the whole worker's event loop
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()